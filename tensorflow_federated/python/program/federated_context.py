@@ -14,7 +14,9 @@
 """Defines an abstract interface for representing a federated context."""
 
 import abc
+import atexit
 from typing import Any
+import weakref
 
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl.computation import computation_base
@@ -25,6 +27,21 @@ from tensorflow_federated.python.core.impl.types import placements
 from tensorflow_federated.python.core.impl.types import type_analysis
 
 
+# Keyed weakly so that cache entries are dropped along with the types they
+# index.
+_contains_only_server_placed_data_cache = weakref.WeakKeyDictionary({})
+
+
+def _clear_contains_only_server_placed_data_cache():
+  # Clear the cache before interpreter shutdown, otherwise removing its entries
+  # may call `__eq__` on types after their modules have been torn down.
+  global _contains_only_server_placed_data_cache
+  _contains_only_server_placed_data_cache = None
+
+
+atexit.register(_clear_contains_only_server_placed_data_cache)
+
+
 def contains_only_server_placed_data(
     type_signature: computation_types.Type) -> bool:
   """Determines if `type_signature` contains only server-placed data.
@@ -43,6 +60,9 @@ def contains_only_server_placed_data(
     `False`.
   """
   py_typecheck.check_type(type_signature, computation_types.Type)
+  cached = _contains_only_server_placed_data_cache.get(type_signature)
+  if cached is not None:
+    return cached
 
   def predicate(type_spec: computation_types.Type) -> bool:
     return (type_spec.is_struct() or
@@ -50,7 +70,9 @@ def contains_only_server_placed_data(
              type_spec.placement is placements.SERVER) or
             type_spec.is_sequence() or type_spec.is_tensor())
 
-  return type_analysis.contains_only(type_signature, predicate)
+  result = type_analysis.contains_only(type_signature, predicate)
+  _contains_only_server_placed_data_cache[type_signature] = result
+  return result
 
 
 class FederatedContext(context_base.Context):
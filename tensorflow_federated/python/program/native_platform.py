@@ -15,9 +15,10 @@
 
 import asyncio
 import collections
-import random
-from typing import Any, Awaitable, Coroutine, List, Optional, Sequence
+import functools
+from typing import Any, Awaitable, Coroutine, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_federated.python.common_libs import async_utils
@@ -41,9 +42,11 @@ class CoroValueReference(value_reference.MaterializableValueReference):
                type_signature: value_reference.MaterializableTffType):
     if not asyncio.iscoroutine(coro):
       raise TypeError(f'Expected a `Coroutine`, found {type(coro)}')
-    py_typecheck.check_type(
+    if not isinstance(
         type_signature,
-        (computation_types.TensorType, computation_types.SequenceType))
+        (computation_types.TensorType, computation_types.SequenceType)):
+      raise TypeError('Expected a `tff.TensorType` or `tff.SequenceType`, '
+                      f'found {type(type_signature)}')
 
     self._coro = coro
     self._type_signature = type_signature
@@ -68,75 +71,216 @@ class CoroValueReference(value_reference.MaterializableValueReference):
     return (self._type_signature == other._type_signature and
             self._coro == other._coro)
 
+  def __hash__(self) -> int:
+    return hash((self._type_signature, self._coro))
 
-def _create_structure_of_coro_references(
-    coro: Coroutine[Any, Any,
-                    Any], type_signature: computation_types.Type) -> Any:
-  """Returns a structure of `tff.program.CoroValueReference`s."""
-  py_typecheck.check_type(type_signature, computation_types.Type)
 
-  if type_signature.is_struct():
+@functools.lru_cache(maxsize=None)
+def _element_types(
+    type_signature: computation_types.StructType
+) -> Tuple[Tuple[Optional[str], computation_types.Type], ...]:
+  """Returns the `(name, type)` elements of `type_signature`.
 
-    async def _to_structure(coro: Coroutine[Any, Any, Any]) -> structure.Struct:
-      return structure.from_container(await coro)
+  Types are interned and immutable, so the elements are computed once per
+  distinct `type_signature` rather than on every traversal.
 
-    coro = _to_structure(coro)
-    shared_awaitable = async_utils.SharedAwaitable(coro)
+  Args:
+    type_signature: The `tff.StructType` to return the elements of.
+  """
+  return tuple(structure.iter_elements(type_signature))
+
+
+@functools.lru_cache(maxsize=None)
+def _unplaced_type(
+    type_signature: computation_types.Type) -> computation_types.Type:
+  """Returns `type_signature` with the server-placed types unwrapped.
 
-    async def _get_item(awaitable: Awaitable[structure.Struct],
-                        index: int) -> Any:
-      value = await awaitable
-      return value[index]
+  Server-placed values are represented by their members, so the traversals in
+  this module only need to distinguish structures from leaves when given the
+  unplaced type.
 
-    elements = []
-    element_types = structure.iter_elements(type_signature)
-    for index, (name, element_type) in enumerate(element_types):
-      element_coro = _get_item(shared_awaitable, index)
-      element = _create_structure_of_coro_references(element_coro, element_type)
-      elements.append((name, element))
-    return structure.Struct(elements)
+  Args:
+    type_signature: The `tff.Type` to unplace.
+  """
+  if type_signature.is_struct():
+    element_types = _element_types(type_signature)
+    unplaced_types = [(name, _unplaced_type(element_type))
+                      for name, element_type in element_types]
+    if all(a is b for (_, a), (_, b) in zip(unplaced_types, element_types)):
+      return type_signature
+    return computation_types.StructType(unplaced_types)
   elif (type_signature.is_federated() and
         type_signature.placement == placements.SERVER):
-    return _create_structure_of_coro_references(coro, type_signature.member)
-  elif type_signature.is_sequence():
-    return CoroValueReference(coro, type_signature)
-  elif type_signature.is_tensor():
-    return CoroValueReference(coro, type_signature)
+    return _unplaced_type(type_signature.member)
   else:
-    raise NotImplementedError(f'Unexpected type found: {type_signature}.')
+    return type_signature
 
 
-async def _materialize_structure_of_value_references(
-    value: Any, type_signature: computation_types.Type) -> Any:
-  """Returns a structure of materialized values."""
-  py_typecheck.check_type(type_signature, computation_types.Type)
+def _flatten_value(value: Any,
+                   type_signature: computation_types.Type) -> List[Any]:
+  """Returns the leaves of `value` in the order described by `type_signature`.
+
+  Structures are traversed, every other type is treated as a leaf.
+
+  Args:
+    value: A value corresponding to `type_signature`.
+    type_signature: The unplaced `tff.Type` of `value`, see `_unplaced_type`.
 
-  async def _materialize(value: Any) -> Any:
-    if isinstance(value, value_reference.MaterializableValueReference):
-      return await value.get_value()
+  Raises:
+    ValueError: If a structure in `value` does not have the same number of
+      elements as the corresponding `tff.StructType` in `type_signature`.
+  """
+  leaves = []
+  stack = [(value, type_signature)]
+  while stack:
+    value, type_signature = stack.pop()
+    if type_signature.is_struct():
+      if not isinstance(value, structure.Struct):
+        value = structure.from_container(value)
+      element_types = _element_types(type_signature)
+      if len(value) != len(element_types):
+        raise ValueError(f'Expected a structure with {len(element_types)} '
+                         f'elements, found {len(value)} elements.')
+      # Elements are pushed in reverse so that they are popped in order.
+      elements = list(zip(value, element_types))
+      for element, (_, element_type) in reversed(elements):
+        stack.append((element, element_type))
     else:
-      return value
+      leaves.append(value)
+  return leaves
+
+
+def _pack_value(leaves: Iterator[Any],
+                type_signature: computation_types.Type) -> Any:
+  """Returns a structure of `leaves` in the shape of `type_signature`.
 
+  This is the inverse of `_flatten_value`, structures are packed as
+  `tff.structure.Struct`s.
+
+  Args:
+    leaves: An iterator of leaves, as returned by `_flatten_value`.
+    type_signature: The unplaced `tff.Type` describing the structure of
+      `leaves`, see `_unplaced_type`.
+  """
+  if not type_signature.is_struct():
+    return next(leaves)
+
+  def _frame(index, name, type_signature):
+    element_types = _element_types(type_signature)
+    return index, name, enumerate(element_types), [None] * len(element_types)
+
+  # Each frame is the position and name of a structure in its parent, its
+  # remaining element types, and its preallocated elements; a frame is packed
+  # once all of its elements are.
+  stack = [_frame(None, None, type_signature)]
+  while True:
+    _, _, element_types, elements = stack[-1]
+    for index, (name, element_type) in element_types:
+      if element_type.is_struct():
+        stack.append(_frame(index, name, element_type))
+        break
+      elements[index] = (name, next(leaves))
+    else:
+      index, name, _, elements = stack.pop()
+      value = structure.Struct(elements)
+      if not stack:
+        return value
+      _, _, _, parent_elements = stack[-1]
+      parent_elements[index] = (name, value)
+
+
+@functools.lru_cache(maxsize=None)
+def _leaf_types(
+    type_signature: computation_types.Type
+) -> Tuple[value_reference.MaterializableTffType, ...]:
+  """Returns the types of the leaves of a value of `type_signature`.
+
+  Args:
+    type_signature: The unplaced `tff.Type` to return the leaf types of, see
+      `_unplaced_type`.
+
+  Raises:
+    NotImplementedError: If `type_signature` contains types other than
+      structures, server-placed values, sequences, or tensors.
+  """
   if type_signature.is_struct():
-    value = structure.from_container(value)
-    element_types = list(structure.iter_elements(type_signature))
-    element_coros = [
-        _materialize_structure_of_value_references(v, t)
-        for v, (_, t) in zip(value, element_types)
-    ]
-    elements = await asyncio.gather(*element_coros)
-    elements = [(n, v) for v, (n, _) in zip(elements, element_types)]
-    return structure.Struct(elements)
-  elif (type_signature.is_federated() and
-        type_signature.placement == placements.SERVER):
-    return await _materialize_structure_of_value_references(
-        value, type_signature.member)
+    leaf_types = []
+    for _, element_type in _element_types(type_signature):
+      leaf_types.extend(_leaf_types(element_type))
+    return tuple(leaf_types)
   elif type_signature.is_sequence():
-    return await _materialize(value)
+    return (type_signature,)
   elif type_signature.is_tensor():
-    return await _materialize(value)
+    return (type_signature,)
   else:
-    return value
+    raise NotImplementedError(f'Unexpected type found: {type_signature}.')
+
+
+def _create_structure_of_coro_references(
+    coro: Coroutine[Any, Any,
+                    Any], type_signature: computation_types.Type) -> Any:
+  """Returns a structure of `tff.program.CoroValueReference`s.
+
+  The value of `coro` is flattened once when it is first awaited and each
+  `tff.program.CoroValueReference` selects its leaf from the flattened value.
+
+  Args:
+    coro: A coroutine returning a value of `type_signature`.
+    type_signature: The `tff.Type` of the value returned by `coro`.
+
+  Raises:
+    NotImplementedError: If `type_signature` contains types other than
+      structures, server-placed values, sequences, or tensors.
+  """
+  py_typecheck.check_type(type_signature, computation_types.Type)
+  type_signature = _unplaced_type(type_signature)
+  leaf_types = _leaf_types(type_signature)
+
+  if not type_signature.is_struct():
+    return CoroValueReference(coro, type_signature)
+
+  async def _flatten(coro: Coroutine[Any, Any, Any]) -> List[Any]:
+    value = await coro
+    return _flatten_value(value, type_signature)
+
+  shared_awaitable = async_utils.SharedAwaitable(_flatten(coro))
+
+  async def _get_item(awaitable: Awaitable[List[Any]], index: int) -> Any:
+    leaves = await awaitable
+    return leaves[index]
+
+  references = [
+      CoroValueReference(_get_item(shared_awaitable, index), leaf_type)
+      for index, leaf_type in enumerate(leaf_types)
+  ]
+  return _pack_value(iter(references), type_signature)
+
+
+async def _materialize_structure_of_value_references(
+    value: Any, type_signature: computation_types.Type) -> Any:
+  """Returns a structure of materialized values.
+
+  The value references in `value` are materialized concurrently; if `value`
+  does not contain any value references, nothing is awaited.
+
+  Args:
+    value: A structure of materialized values and value references.
+    type_signature: The `tff.Type` of `value`.
+  """
+  py_typecheck.check_type(type_signature, computation_types.Type)
+  type_signature = _unplaced_type(type_signature)
+
+  leaves = _flatten_value(value, type_signature)
+  indices = [
+      index for index, leaf in enumerate(leaves)
+      if isinstance(leaf, value_reference.MaterializableValueReference)
+  ]
+  if indices:
+    materialized = await asyncio.gather(
+        *[leaves[index].get_value() for index in indices])
+    for index, leaf in zip(indices, materialized):
+      leaves[index] = leaf
+  return _pack_value(iter(leaves), type_signature)
 
 
 class NativeFederatedContext(federated_context.FederatedContext):
@@ -173,6 +317,36 @@ class NativeFederatedContext(federated_context.FederatedContext):
       ValueError: If the result type of the invoked comptuation does not contain
       only structures, server-placed values, or tensors.
     """
+    self._check_computation(comp)
+    return self._invoke(comp, arg)
+
+  def invoke_many(self, comp: computation_base.Computation,
+                  args: Sequence[Any]) -> List[Any]:
+    """Invokes the `comp` once with each argument in `args`.
+
+    This is equivalent to invoking `comp` with each argument in turn, but `comp`
+    is only checked once. All of `args` must be known before invoking `comp`, so
+    this is only suitable for independent arguments (e.g. evaluating many
+    batches of client data) and not for invocations that depend on the result
+    of a previous invocation (e.g. rounds of training).
+
+    Args:
+      comp: The `tff.Computation` being invoked.
+      args: A sequence of optional arguments of `comp`.
+
+    Returns:
+      A list of the results of invocation, in the same order as `args`.
+
+    Raises:
+      ValueError: If the result type of the invoked comptuation does not contain
+      only structures, server-placed values, or tensors.
+    """
+    self._check_computation(comp)
+    py_typecheck.check_type(args, collections.abc.Sequence)
+    return [self._invoke(comp, arg) for arg in args]
+
+  def _check_computation(self, comp: computation_base.Computation):
+    """Checks that `comp` can be invoked in this context."""
     py_typecheck.check_type(comp, computation_base.Computation)
 
     result_type = comp.type_signature.result
@@ -182,19 +356,59 @@ class NativeFederatedContext(federated_context.FederatedContext):
           'structures, server-placed values, or tensors, found '
           f'\'{result_type}\'.')
 
-    async def _invoke(context: context_base.Context,
-                      comp: computation_base.Computation, arg: Any) -> Any:
+  def _invoke(self, comp: computation_base.Computation, arg: Any) -> Any:
+    """Invokes the `comp` with the argument `arg`, see `invoke`."""
+
+    async def _invoke_async(context: context_base.Context,
+                            comp: computation_base.Computation,
+                            arg: Any) -> Any:
       if comp.type_signature.parameter is not None:
         arg = await _materialize_structure_of_value_references(
             arg, comp.type_signature.parameter)
       return await context.invoke(comp, arg)
 
-    result_coro = _invoke(self._context, comp, arg)
+    result_type = comp.type_signature.result
+    result_coro = _invoke_async(self._context, comp, arg)
     result = _create_structure_of_coro_references(result_coro, result_type)
     result = type_conversions.type_to_py_container(result, result_type)
     return result
 
 
+def _check_datasets(datasets: Sequence[tf.data.Dataset]) -> Any:
+  """Checks that `datasets` is a non-empty sequence of similar datasets.
+
+  Args:
+    datasets: A sequence of `tf.data.Dataset`s to check.
+
+  Returns:
+    The type specification shared by each `tf.data.Dataset` in `datasets`.
+
+  Raises:
+    TypeError: If `datasets` is not a sequence of `tf.data.Dataset`s.
+    ValueError: If `datasets` is an empty list or if each `tf.data.Dataset` in
+      `datasets` does not have the same type specification.
+  """
+  py_typecheck.check_type(datasets, collections.abc.Sequence)
+  if not datasets:
+    raise ValueError('Expected `datasets` to not be an empty list.')
+  for dataset in datasets:
+    if not isinstance(dataset, tf.data.Dataset):
+      raise TypeError('Expected each element in `datasets` to be a '
+                      f'`tf.data.Dataset`, found {type(dataset)}.')
+  element_spec = datasets[0].element_spec
+  for dataset in datasets[1:]:
+    spec = dataset.element_spec
+    # Datasets created by the same pipeline often share their type
+    # specification, in which case the comparison can be skipped.
+    if spec is element_spec:
+      continue
+    if spec != element_spec:
+      raise ValueError('Expected each `tf.data.Dataset` in `datasets` to '
+                       'have the same type specification, found '
+                       f'\'{element_spec}\' and \'{spec}\'.')
+  return element_spec
+
+
 class DatasetDataSourceIterator(data_source.FederatedDataSourceIterator):
   """A `tff.program.FederatedDataSourceIterator` backed by `tf.data.Dataset`s.
 
@@ -203,8 +417,11 @@ class DatasetDataSourceIterator(data_source.FederatedDataSourceIterator):
   uniformly random with replacement.
   """
 
-  def __init__(self, datasets: Sequence[tf.data.Dataset],
-               federated_type: computation_types.FederatedType):
+  def __init__(self,
+               datasets: Sequence[tf.data.Dataset],
+               federated_type: computation_types.FederatedType,
+               prefetch: bool = True,
+               seed: Optional[int] = None):
     """Returns an initialized `tff.program.DatasetDataSourceIterator`.
 
     Args:
@@ -212,25 +429,30 @@ class DatasetDataSourceIterator(data_source.FederatedDataSourceIterator):
         this data source.
       federated_type: The type of the data returned by calling `select` on an
         iterator.
+      prefetch: Whether the selected `tf.data.Dataset`s should prefetch their
+        elements using `tf.data.AUTOTUNE`, this does not change the elements
+        yielded by the `tf.data.Dataset`s. Each `tf.data.Dataset` is wrapped
+        the first time it is selected and the wrapped `tf.data.Dataset` is
+        kept for the lifetime of the iterator, so it holds one wrapped
+        `tf.data.Dataset` for each client it has ever selected.
+      seed: An optional seed used to select data, iterators with the same
+        `datasets` and `seed` make the same selections.
 
     Raises:
       ValueError: If `datasets` is an empty list or if each `tf.data.Dataset` in
         `datasets` does not have the same type specification.
     """
-    py_typecheck.check_type(datasets, collections.abc.Sequence)
-    if not datasets:
-      raise ValueError('Expected `datasets` to not be an empty list.')
-    for dataset in datasets:
-      py_typecheck.check_type(dataset, tf.data.Dataset)
-      element_spec = datasets[0].element_spec
-      if dataset.element_spec != element_spec:
-        raise ValueError('Expected each `tf.data.Dataset` in `datasets` to '
-                         'have the same type specification, found '
-                         f'\'{element_spec}\' and \'{dataset.element_spec}\'.')
+    _check_datasets(datasets)
     py_typecheck.check_type(federated_type, computation_types.FederatedType)
+    py_typecheck.check_type(prefetch, bool)
+    if seed is not None:
+      py_typecheck.check_type(seed, int)
 
     self._datasets = datasets
     self._federated_type = federated_type
+    self._prefetch = prefetch
+    self._prefetched_datasets = {}
+    self._rng = np.random.default_rng(seed)
 
   @property
   def federated_type(self) -> computation_types.FederatedType:
@@ -252,7 +474,19 @@ class DatasetDataSourceIterator(data_source.FederatedDataSourceIterator):
         number_of_clients > len(self._datasets)):
       raise ValueError('Expected `number_of_clients` to be a positive integer '
                        'and less than the number of `datasets`.')
-    return random.choices(population=self._datasets, k=number_of_clients)
+    indices = self._rng.integers(
+        low=0, high=len(self._datasets), size=number_of_clients)
+    return [self._get_dataset(index) for index in indices.tolist()]
+
+  def _get_dataset(self, index: int) -> tf.data.Dataset:
+    """Returns the `tf.data.Dataset` of the client at `index`."""
+    if not self._prefetch:
+      return self._datasets[index]
+    dataset = self._prefetched_datasets.get(index)
+    if dataset is None:
+      dataset = self._datasets[index].prefetch(tf.data.AUTOTUNE)
+      self._prefetched_datasets[index] = dataset
+    return dataset
 
 
 class DatasetDataSource(data_source.FederatedDataSource):
@@ -263,31 +497,34 @@ class DatasetDataSource(data_source.FederatedDataSource):
   uniformly random with replacement.
   """
 
-  def __init__(self, datasets: Sequence[tf.data.Dataset]):
+  def __init__(self,
+               datasets: Sequence[tf.data.Dataset],
+               prefetch: bool = True,
+               seed: Optional[int] = None):
     """Returns an initialized `tff.program.DatasetDataSource`.
 
     Args:
       datasets: A sequence of `tf.data.Dataset's to use to yield the data from
         this data source.
+      prefetch: Whether the `tf.data.Dataset`s selected by an iterator should
+        prefetch their elements, see `tff.program.DatasetDataSourceIterator`.
+      seed: An optional seed used by each iterator to select data, see
+        `tff.program.DatasetDataSourceIterator`.
 
     Raises:
       ValueError: If `datasets` is an empty list or if each `tf.data.Dataset` in
         `datasets` does not have the same type specification.
     """
-    py_typecheck.check_type(datasets, collections.abc.Sequence)
-    if not datasets:
-      raise ValueError('Expected `datasets` to not be an empty list.')
-    for dataset in datasets:
-      py_typecheck.check_type(dataset, tf.data.Dataset)
-      element_spec = datasets[0].element_spec
-      if dataset.element_spec != element_spec:
-        raise ValueError('Expected each `tf.data.Dataset` in `datasets` to '
-                         'have the same type specification, found '
-                         f'\'{element_spec}\' and \'{dataset.element_spec}\'.')
+    element_spec = _check_datasets(datasets)
+    py_typecheck.check_type(prefetch, bool)
+    if seed is not None:
+      py_typecheck.check_type(seed, int)
 
     self._datasets = datasets
     self._federated_type = computation_types.FederatedType(
         computation_types.SequenceType(element_spec), placements.CLIENTS)
+    self._prefetch = prefetch
+    self._seed = seed
 
   @property
   def federated_type(self) -> computation_types.FederatedType:
@@ -301,4 +538,8 @@ class DatasetDataSource(data_source.FederatedDataSource):
 
   def iterator(self) -> DatasetDataSourceIterator:
     """Returns a new iterator for retrieving data from this data source."""
-    return DatasetDataSourceIterator(self._datasets, self._federated_type)
+    return DatasetDataSourceIterator(
+        self._datasets,
+        self._federated_type,
+        prefetch=self._prefetch,
+        seed=self._seed)
@@ -93,6 +93,19 @@ class CoroValueReferenceTest(parameterized.TestCase,
 
     self.assertEqual(actual_value, expected_value)
 
+  def test_hash_returns_same_value_for_equal_references(self):
+    coro = _coro(1)
+    type_signature = computation_types.TensorType(tf.int32)
+    value_reference = native_platform.CoroValueReference(
+        coro=coro, type_signature=type_signature)
+    other_value_reference = native_platform.CoroValueReference(
+        coro=coro, type_signature=type_signature)
+
+    self.assertEqual(value_reference, other_value_reference)
+    self.assertEqual(hash(value_reference), hash(other_value_reference))
+    self.assertLen({value_reference, other_value_reference}, 1)
+    coro.close()
+
 
 class CreateStructureOfCoroReferencesTest(parameterized.TestCase,
                                           unittest.IsolatedAsyncioTestCase):
@@ -346,6 +359,21 @@ class MaterializeStructureOfValueReferencesTest(parameterized.TestCase,
 
     self.assertEqual(actual_value, expected_value)
 
+  async def test_returns_value_without_value_references(self):
+    value = collections.OrderedDict([('a', True), ('b', 1)])
+    type_signature = computation_types.StructType([
+        ('a', computation_types.TensorType(tf.bool)),
+        ('b', computation_types.TensorType(tf.int32)),
+    ])
+
+    with mock.patch.object(asyncio, 'gather') as mock_gather:
+      actual_value = await native_platform._materialize_structure_of_value_references(
+          value=value, type_signature=type_signature)
+
+    mock_gather.assert_not_called()
+    expected_value = structure.Struct([('a', True), ('b', 1)])
+    self.assertEqual(actual_value, expected_value)
+
   @parameterized.named_parameters(
       ('none', None),
       ('bool', True),
@@ -358,6 +386,18 @@ class MaterializeStructureOfValueReferencesTest(parameterized.TestCase,
       await native_platform._materialize_structure_of_value_references(
           value=1, type_signature=type_signature)
 
+  async def test_raises_value_error_with_value(self):
+    value = (True, 1)
+    type_signature = computation_types.StructType([
+        (None, computation_types.TensorType(tf.bool)),
+        (None, computation_types.TensorType(tf.int32)),
+        (None, computation_types.TensorType(tf.string)),
+    ])
+
+    with self.assertRaises(ValueError):
+      await native_platform._materialize_structure_of_value_references(
+          value=value, type_signature=type_signature)
+
 
 class NativeFederatedContextTest(parameterized.TestCase,
                                  unittest.IsolatedAsyncioTestCase,
@@ -446,6 +486,54 @@ class NativeFederatedContextTest(parameterized.TestCase,
           return_value=False):
         context.invoke(return_one, None)
 
+  async def test_invoke_many_returns_results(self):
+    context = execution_contexts.create_local_async_python_execution_context()
+    context = native_platform.NativeFederatedContext(context)
+
+    @tensorflow_computation.tf_computation(tf.int32, tf.int32)
+    def add(x, y):
+      return x + y
+
+    args = [
+        structure.Struct.unnamed(1, 2),
+        structure.Struct.unnamed(3, 4),
+    ]
+    results = context.invoke_many(add, args)
+
+    actual_values = [await r.get_value() for r in results]
+    self.assertEqual(actual_values, [3, 7])
+
+  def test_invoke_many_checks_comp_once(self):
+    context = execution_contexts.create_local_async_python_execution_context()
+    context = native_platform.NativeFederatedContext(context)
+
+    @tensorflow_computation.tf_computation()
+    def return_one():
+      return 1
+
+    with mock.patch.object(
+        federated_context, 'contains_only_server_placed_data',
+        return_value=True) as mock_contains_only_server_placed_data:
+      results = context.invoke_many(return_one, [None, None, None])
+
+    self.assertLen(results, 3)
+    mock_contains_only_server_placed_data.assert_called_once()
+
+  def test_invoke_many_raises_value_error_with_comp(self):
+    context = execution_contexts.create_local_async_python_execution_context()
+    context = native_platform.NativeFederatedContext(context)
+
+    @tensorflow_computation.tf_computation()
+    def return_one():
+      return 1
+
+    with self.assertRaises(ValueError):
+      with mock.patch.object(
+          federated_context,
+          'contains_only_server_placed_data',
+          return_value=False):
+        context.invoke_many(return_one, [None])
+
   async def test_computation_returns_result(self):
     context = execution_contexts.create_local_async_python_execution_context()
     context = native_platform.NativeFederatedContext(context)
@@ -551,6 +639,46 @@ class DatasetDataSourceIteratorTest(parameterized.TestCase, tf.test.TestCase):
       expected_dataset = tf.data.Dataset.from_tensor_slices([1, 2, 3])
       self.assertSameElements(actual_dataset, expected_dataset)
 
+  def test_select_returns_datasets_without_prefetch(self):
+    datasets = [tf.data.Dataset.from_tensor_slices([1, 2, 3])]
+    federated_type = computation_types.FederatedType(
+        computation_types.SequenceType(tf.int32), placements.CLIENTS)
+    iterator = native_platform.DatasetDataSourceIterator(
+        datasets=datasets, federated_type=federated_type, prefetch=False)
+
+    data = iterator.select(1)
+
+    self.assertIs(data[0], datasets[0])
+
+  def test_select_returns_same_prefetched_dataset(self):
+    datasets = [tf.data.Dataset.from_tensor_slices([1, 2, 3])]
+    federated_type = computation_types.FederatedType(
+        computation_types.SequenceType(tf.int32), placements.CLIENTS)
+    iterator = native_platform.DatasetDataSourceIterator(
+        datasets=datasets, federated_type=federated_type)
+
+    data = iterator.select(1)
+    other_data = iterator.select(1)
+
+    self.assertIsNot(data[0], datasets[0])
+    self.assertIs(data[0], other_data[0])
+    self.assertSameElements(data[0], datasets[0])
+
+  def test_select_returns_same_data_with_same_seed(self):
+    datasets = [tf.data.Dataset.from_tensor_slices([i]) for i in range(10)]
+    federated_type = computation_types.FederatedType(
+        computation_types.SequenceType(tf.int32), placements.CLIENTS)
+    iterator = native_platform.DatasetDataSourceIterator(
+        datasets=datasets, federated_type=federated_type, seed=1)
+    other_iterator = native_platform.DatasetDataSourceIterator(
+        datasets=datasets, federated_type=federated_type, seed=1)
+
+    data = iterator.select(5)
+    other_data = other_iterator.select(5)
+
+    self.assertEqual([list(d.as_numpy_iterator()) for d in data],
+                     [list(d.as_numpy_iterator()) for d in other_data])
+
   @parameterized.named_parameters(
       ('none', None),
       ('negative', -1),
@@ -598,6 +726,36 @@ class DatasetDataSourceTest(parameterized.TestCase):
     with self.assertRaises(ValueError):
       native_platform.DatasetDataSource(datasets=datasets)
 
+  def test_iterator_returns_datasets_without_prefetch(self):
+    datasets = [tf.data.Dataset.from_tensor_slices([1, 2, 3])]
+    data_source = native_platform.DatasetDataSource(
+        datasets=datasets, prefetch=False)
+
+    data = data_source.iterator().select(1)
+
+    self.assertIs(data[0], datasets[0])
+
+  @parameterized.named_parameters(
+      ('none', None),
+      ('int', 1),
+      ('str', 'a'),
+  )
+  def test_init_raises_type_error_with_prefetch(self, prefetch):
+    datasets = [tf.data.Dataset.from_tensor_slices([1, 2, 3])]
+
+    with self.assertRaises(TypeError):
+      native_platform.DatasetDataSource(datasets=datasets, prefetch=prefetch)
+
+  def test_iterator_returns_same_data_with_same_seed(self):
+    datasets = [tf.data.Dataset.from_tensor_slices([i]) for i in range(10)]
+    data_source = native_platform.DatasetDataSource(datasets=datasets, seed=1)
+
+    data = data_source.iterator().select(5)
+    other_data = data_source.iterator().select(5)
+
+    self.assertEqual([list(d.as_numpy_iterator()) for d in data],
+                     [list(d.as_numpy_iterator()) for d in other_data])
+
   def test_init_raises_value_error_with_datasets_different_types(self):
     datasets = [
         tf.data.Dataset.from_tensor_slices([1, 2, 3]),
@@ -13,10 +13,11 @@
 # limitations under the License.
 """Utilities for testing the program library."""
 
-
+import itertools
 from typing import Any
 
 import attr
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_federated.python.core.impl.types import computation_types
@@ -66,6 +67,15 @@ class TestMaterializableValueReference(
     if self._type_signature != other._type_signature:
       return False
     if self._type_signature.is_sequence():
-      return list(self._value) == list(other._value)
+      if self._value.element_spec != other._value.element_spec:
+        return False
+      sentinel = object()
+      for a, b in itertools.zip_longest(
+          self._value, other._value, fillvalue=sentinel):
+        if a is sentinel or b is sentinel:
+          return False
+        if not np.array_equal(a, b):
+          return False
+      return True
     else:
-      return self._value == other._value
+      return np.array_equal(self._value, other._value)